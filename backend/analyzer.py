@@ -5,21 +5,35 @@ from datetime import datetime, timedelta, timezone
 import requests
 from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler
-from sklearn.feature_extraction.text import TfidfVectorizer
 import nltk
 from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
 from nltk.stem import WordNetLemmatizer
 from textblob import TextBlob
 import re
+import time
+import hashlib
 from collections import Counter
 import warnings
+from functools import partial
 from statsmodels.tsa.arima.model import ARIMA
 from dotenv import load_dotenv
+from churn import CommitDetailCache, fetch_commit_stats
+from sketches import ReservoirSample, SpaceSaving, CountMinSketch, HyperLogLog
+from terms import TermImportance
+from cache import get_cache
+from stages import Stage, run_stages, get_process_pool
 
 load_dotenv()
 warnings.filterwarnings('ignore')
 
+# How long fetched GitHub listings stay in the shared cache
+FETCH_CACHE_TTL = int(os.getenv('GITHUB_CACHE_TTL', 600))
+
+# Limits on the approximate commit walk so it fits inside one web request. 0 means no limit.
+APPROXIMATE_MAX_PAGES = int(os.getenv('APPROXIMATE_MAX_PAGES', 20))
+APPROXIMATE_TIME_BUDGET = float(os.getenv('APPROXIMATE_TIME_BUDGET', 20))
+
 def initialize_nltk():
     """Initialize NLTK data"""
     nltk_data_dir = os.path.join(os.getcwd(), "nltk_data")
@@ -67,12 +81,170 @@ def safe_preprocess_text(text):
         return text
 
 
+def repos_to_records(repos_df):
+    """Convert repositories to JSON-safe records"""
+    repos_dict = repos_df.to_dict('records')
+    for repo in repos_dict:
+        for key in ['created_at', 'updated_at', 'pushed_at']:
+            if key in repo and repo[key]:
+                repo[key] = str(repo[key])
+        # Repos with no fetched commits have no churn features
+        for key in ['avg_churn', 'net_lines']:
+            if key in repo and pd.isna(repo[key]):
+                repo[key] = None
+    return repos_dict
+
+
+def commits_to_records(commits_df):
+    """Convert commits to JSON-safe records"""
+    commits_dict = commits_df.to_dict('records')
+    for commit in commits_dict:
+        if 'date' in commit and commit['date']:
+            commit['date'] = str(commit['date'])
+        # Commits whose churn was not fetched within the request budget
+        for key in ['additions', 'deletions', 'files_changed', 'churn']:
+            if key in commit and pd.isna(commit[key]):
+                commit[key] = None
+    return commits_dict
+
+
+def extract_commit(repo_name, commit):
+    """The fields used from a /repos/{owner}/{repo}/commits listing entry"""
+    commit_data = commit.get("commit", {})
+    author_data = commit_data.get("author", {})
+    return {
+        "repo_name": repo_name,
+        "sha": commit.get("sha"),
+        "message": commit_data.get("message"),
+        "author_name": author_data.get("name"),
+        "author_email": author_data.get("email"),
+        "date": author_data.get("date"),
+        "url": commit.get("html_url")
+    }
+
+
+ACTION_WORDS = ['add', 'update', 'fix', 'remove', 'implement', 'refactor', 'change', 'merge']
+FIX_PATTERN = r'\b(fix|fixes|fixed|bug|issue)\b'
+
+
+class CommitStreamSummary:
+    def __init__(self, sample_size=5000, top_k=1000, repo_top_k=100, cms_width=2048, cms_depth=5, hll_precision=12):
+        """Bounded-memory summary of a commit stream for approximate analysis"""
+        self.total = 0
+        self.messages = 0
+        self.message_length_sum = 0
+        self.short_count = 0
+        self.fix_count = 0
+        self.first_date = None
+        self.last_date = None
+        # Repos whose history was not read to the end, with the reason
+        self.incomplete_repos = {}
+        
+        # Calendar buckets and repo counts are bounded by the calendar and repo list
+        self.hourly = Counter()
+        self.daily = Counter()
+        self.monthly = Counter()
+        self.by_date = Counter()
+        self.repos = Counter()
+        self.action_counts = Counter({word: 0 for word in ACTION_WORDS})
+        
+        self.sample = ReservoirSample(sample_size)
+        self.word_counts = SpaceSaving(top_k)
+        self.word_sketch = CountMinSketch(cms_width, cms_depth)
+        self.repo_top_k = repo_top_k
+        self.repo_terms = {}
+        self.distinct_words = HyperLogLog(hll_precision)
+        self.distinct_authors = HyperLogLog(hll_precision)
+        
+    def add(self, commit):
+        """Fold one commit into the summary"""
+        self.total += 1
+        self.sample.add(commit)
+        self.repos[commit['repo_name']] += 1
+        
+        author = commit.get('author_email') or commit.get('author_name')
+        if author:
+            self.distinct_authors.add(author)
+        
+        if commit.get('date'):
+            date = pd.Timestamp(commit['date'])
+            self.hourly[date.hour] += 1
+            self.daily[date.day_name()] += 1
+            self.monthly[date.month_name()] += 1
+            self.by_date[date.date()] += 1
+            if self.first_date is None or date < self.first_date:
+                self.first_date = date
+            if self.last_date is None or date > self.last_date:
+                self.last_date = date
+        
+        message = commit.get('message')
+        if not isinstance(message, str):
+            return
+        
+        self.messages += 1
+        self.message_length_sum += len(message)
+        if len(message) < 10:
+            self.short_count += 1
+        if re.search(FIX_PATTERN, message, re.IGNORECASE):
+            self.fix_count += 1
+        for word in ACTION_WORDS:
+            if re.search(fr'\b{word}\b', message, re.IGNORECASE):
+                self.action_counts[word] += 1
+        
+        repo_terms = self.repo_terms.get(commit['repo_name'])
+        if repo_terms is None:
+            repo_terms = self.repo_terms[commit['repo_name']] = SpaceSaving(self.repo_top_k)
+        for token in safe_preprocess_text(message).split():
+            self.word_counts.add(token)
+            self.word_sketch.add(token)
+            self.distinct_words.add(token)
+            repo_terms.add(token)
+    
+    def commits_by_date(self):
+        return pd.Series(self.by_date).sort_index()
+    
+    @property
+    def truncated(self):
+        return bool(self.incomplete_repos)
+    
+    def word_freq(self, n=20):
+        """Top words, using the tighter of the space-saving and Count-Min estimates"""
+        candidates = [
+            (word, min(count, self.word_sketch.estimate(word)))
+            for word, count, _ in self.word_counts.top(n)
+        ]
+        return sorted(candidates, key=lambda x: x[1], reverse=True)
+    
+    def repo_top_terms(self, n=5):
+        """TF-IDF style top terms per repo computed from the per-repo sketches"""
+        if len(self.repo_terms) < 2:
+            return {}
+        
+        doc_freq = Counter()
+        for terms in self.repo_terms.values():
+            doc_freq.update(terms.counts.keys())
+        
+        n_docs = len(self.repo_terms)
+        repo_top_terms = {}
+        for repo, terms in self.repo_terms.items():
+            scores = {
+                term: count * (np.log((1 + n_docs) / (1 + doc_freq[term])) + 1)
+                for term, count in terms.counts.items()
+            }
+            norm = np.sqrt(sum(v * v for v in scores.values())) or 1.0
+            ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)[:n]
+            repo_top_terms[repo] = [(term, float(score / norm)) for term, score in ranked]
+        return repo_top_terms
+
+
 class GitHubAnalyzer:
-    def __init__(self, username, token=None):
+    def __init__(self, username, token=None, base_url=None, churn_budget=200, churn_workers=8,
+                 approximate=False, sample_size=5000, approximate_max_pages=None, approximate_time_budget=None,
+                 hashing_terms=None, cache=None):
         """Setup GitHub connection"""
         self.username = username
         self.token = token or os.getenv('GITHUB_TOKEN')
-        self.base_url = "https://api.github.com"
+        self.base_url = (base_url or os.getenv('GITHUB_API_URL') or "https://api.github.com").rstrip('/')
         self.headers = {
             'Accept': 'application/vnd.github.v3+json'
         }
@@ -84,42 +256,81 @@ class GitHubAnalyzer:
         self.issues_data = None
         self.pull_requests_data = None
         
+        self.churn_budget = churn_budget
+        self.churn_workers = churn_workers
+        self.commit_cache = CommitDetailCache()
+        
+        # Approximate mode streams commits through sketches and keeps only a sample
+        self.approximate = approximate
+        self.sample_size = sample_size
+        # Commit pages per repo and seconds for the whole walk in approximate mode; 0 means no limit
+        if approximate_max_pages is None:
+            approximate_max_pages = APPROXIMATE_MAX_PAGES
+        if approximate_time_budget is None:
+            approximate_time_budget = APPROXIMATE_TIME_BUDGET
+        self.approximate_max_pages = approximate_max_pages
+        self.approximate_time_budget = approximate_time_budget
+        self.commit_summary = None
+        # Repos whose commit listing stopped before the end, with the reason
+        self.incomplete_repos = {}
+        
+        if hashing_terms is None:
+            hashing_terms = os.getenv('TERM_HASHING', '').lower() in ('1', 'true', 'yes')
+        self.hashing_terms = hashing_terms
+        
+        # Fetched data is only shared between requests made with the same token
+        self.cache = cache if cache is not None else get_cache()
+        self.cache_scope = hashlib.sha256(f"{self.base_url}|{self.token}".encode('utf-8')).hexdigest()[:16]
+        
     def check_rate_limit(self):
         """Check GitHub API rate limit status"""
+        remaining = self.rate_limit_remaining()
+        return remaining is not None and remaining > 0
+
+    def rate_limit_remaining(self):
+        """Remaining core API requests, or None if unknown"""
         try:
             response = requests.get(f"{self.base_url}/rate_limit", headers=self.headers)
             if response.status_code == 200:
                 data = response.json()
                 core_rate = data['resources']['core']
-                remaining = core_rate['remaining']
-                return remaining > 0
-            return False
+                return core_rate['remaining']
+            return None
         except Exception:
-            return False
+            return None
 
     def get_user_repos(self, per_page=100, max_pages=10):
         """Fetch all repositories (public + private) for the authenticated user"""
         if not self.token:
             return pd.DataFrame()  # cannot fetch private repos without token
 
-        headers = {"Authorization": f"token {self.token}"}
-        all_repos = []
-        page = 1
+        cache_key = f"repos:{self.cache_scope}:{per_page}:{max_pages}"
+        all_repos = self.cache.get(cache_key)
+        if all_repos is None:
+            headers = {"Authorization": f"token {self.token}"}
+            all_repos = []
+            page = 1
+            complete = True
 
-        while page <= max_pages:
-            url = f"{self.base_url}/user/repos"
-            params = {"per_page": per_page, "page": page, "type": "all"}
-            response = requests.get(url, headers=headers, params=params)
+            while page <= max_pages:
+                url = f"{self.base_url}/user/repos"
+                params = {"per_page": per_page, "page": page, "type": "all"}
+                response = requests.get(url, headers=headers, params=params)
 
-            if response.status_code != 200:
-                break
+                if response.status_code != 200:
+                    complete = False
+                    break
 
-            repos = response.json()
-            all_repos.extend(repos)
+                repos = response.json()
+                all_repos.extend(repos)
 
-            if len(repos) < per_page:
-                break
-            page += 1
+                if len(repos) < per_page:
+                    break
+                page += 1
+
+            # A failed page would otherwise pin an empty or partial listing until it expires
+            if complete:
+                self.cache.set(cache_key, all_repos, ttl=FETCH_CACHE_TTL)
 
         repos_df = pd.DataFrame([{
             'repo_id': repo['id'],
@@ -148,43 +359,53 @@ class GitHubAnalyzer:
 
     def get_commits_for_repo(self, repo_name, per_page=50, max_pages=5):
         """Fetch commits for a given repository"""
-        all_commits = []
-        page = 1
+        return list(self.iter_commits_for_repo(repo_name, per_page=per_page, max_pages=max_pages))
 
-        while page <= max_pages:
-            url = f"{self.base_url}/repos/{self.username}/{repo_name}/commits"
-            params = {"per_page": per_page, "page": page}
-            response = requests.get(url, headers=self.headers, params=params)
+    def iter_commits_for_repo(self, repo_name, per_page=50, max_pages=5, deadline=None):
+        """Yield commits for a given repository one page at a time.
+
+        max_pages=None means no page limit, and deadline is a time.monotonic()
+        value after which no more pages are requested. When the listing stops
+        before the last page the reason is recorded in incomplete_repos.
+        """
+        page = 1
+        # An unbounded walk would push everything else out of the cache, so only bounded listings are cached
+        use_cache = max_pages is not None
 
-            if response.status_code != 200:
+        while True:
+            if max_pages is not None and page > max_pages:
+                self.incomplete_repos[repo_name] = 'page_limit'
                 break
+            if deadline is not None and time.monotonic() > deadline:
+                self.incomplete_repos[repo_name] = 'time_limit'
+                break
+            cache_key = f"commit_page:{self.cache_scope}:{self.username}/{repo_name}:{per_page}:{page}"
+            commits = self.cache.get(cache_key) if use_cache else None
+            if commits is None:
+                url = f"{self.base_url}/repos/{self.username}/{repo_name}/commits"
+                params = {"per_page": per_page, "page": page}
+                response = requests.get(url, headers=self.headers, params=params)
+
+                if response.status_code != 200:
+                    self.incomplete_repos[repo_name] = f"http_{response.status_code}"
+                    break
+
+                # Keep only the fields the analyses use, not the full GitHub payload
+                commits = [extract_commit(repo_name, commit) for commit in response.json()]
+                if use_cache:
+                    self.cache.set(cache_key, commits, ttl=FETCH_CACHE_TTL)
 
-            commits = response.json()
             if not commits:
                 break
 
-            for commit in commits:
-                commit_data = commit.get("commit", {})
-                author_data = commit_data.get("author", {})
-
-                all_commits.append({
-                    "repo_name": repo_name,
-                    "sha": commit.get("sha"),
-                    "message": commit_data.get("message"),
-                    "author_name": author_data.get("name"),
-                    "author_email": author_data.get("email"),
-                    "date": author_data.get("date"),
-                    "url": commit.get("html_url")
-                })
+            yield from commits
 
             if len(commits) < per_page:
                 break
 
             page += 1
 
-        return all_commits
-
-    def get_all_commits(self, max_repos=None):
+    def get_all_commits(self, max_repos=None, with_churn=False):
         """Fetch commits from all repositories or a subset"""
         if self.repos_data is None:
             self.get_user_repos()
@@ -195,9 +416,21 @@ class GitHubAnalyzer:
         all_commits = []
         repos_to_process = self.repos_data['name'].head(max_repos).tolist() if max_repos else self.repos_data['name'].tolist()
         
-        for repo_name in repos_to_process:
-            commits = self.get_commits_for_repo(repo_name)
-            all_commits.extend(commits)
+        if self.approximate:
+            summary = CommitStreamSummary(sample_size=self.sample_size)
+            max_pages = self.approximate_max_pages or None
+            deadline = time.monotonic() + self.approximate_time_budget if self.approximate_time_budget else None
+            for repo_name in repos_to_process:
+                for commit in self.iter_commits_for_repo(repo_name, per_page=100, max_pages=max_pages, deadline=deadline):
+                    summary.add(commit)
+                if repo_name in self.incomplete_repos:
+                    summary.incomplete_repos[repo_name] = self.incomplete_repos[repo_name]
+            self.commit_summary = summary
+            all_commits = summary.sample.items
+        else:
+            for repo_name in repos_to_process:
+                commits = self.get_commits_for_repo(repo_name)
+                all_commits.extend(commits)
         
         commits_df = pd.DataFrame(all_commits)
         
@@ -216,31 +449,61 @@ class GitHubAnalyzer:
             
             commits_df['is_short_message'] = commits_df['message_length'] < 10
             commits_df['has_fix_keyword'] = commits_df['message'].str.contains(
-                r'\b(fix|fixes|fixed|bug|issue)\b', case=False, regex=True
+                FIX_PATTERN, case=False, regex=True
             ).fillna(False)
+            
+            if with_churn:
+                self.add_churn(commits_df)
         
         self.commits_data = commits_df
         return commits_df
 
+    def add_churn(self, commits_df):
+        """Add additions/deletions/churn columns from the commit detail endpoint"""
+        stats = fetch_commit_stats(
+            self.base_url, self.headers, self.username,
+            zip(commits_df['repo_name'], commits_df['sha']),
+            self.commit_cache,
+            max_workers=self.churn_workers,
+            budget=self.churn_budget
+        )
+        
+        # Commits beyond the request budget are left as NaN until a later request caches them
+        for col in ['additions', 'deletions', 'files_changed']:
+            commits_df[col] = commits_df['sha'].map(
+                lambda sha: stats[sha][col] if sha in stats else np.nan
+            ).astype(float)
+        commits_df['churn'] = commits_df['additions'] + commits_df['deletions']
+        return commits_df
+
     
     def analyze_commit_patterns(self):
         """Analyze commit patterns and return insights"""
         if self.commits_data is None or self.commits_data.empty:
             return {}
             
-        hourly_commits = self.commits_data['hour'].value_counts().sort_index()
-        daily_commits = self.commits_data['day'].value_counts()
-        monthly_commits = self.commits_data['month'].value_counts()
+        if self.commit_summary is not None:
+            summary = self.commit_summary
+            hourly_commits = pd.Series(summary.hourly).sort_index()
+            daily_commits = pd.Series(summary.daily).sort_values(ascending=False)
+            monthly_commits = pd.Series(summary.monthly).sort_values(ascending=False)
+            
+            avg_message_length = summary.message_length_sum / summary.messages if summary.messages else 0
+            short_commits_pct = summary.short_count / summary.total * 100
+            fix_commits_pct = summary.fix_count / summary.total * 100
+        else:
+            hourly_commits = self.commits_data['hour'].value_counts().sort_index()
+            daily_commits = self.commits_data['day'].value_counts()
+            monthly_commits = self.commits_data['month'].value_counts()
+            
+            avg_message_length = self.commits_data['message_length'].mean()
+            short_commits_pct = self.commits_data['is_short_message'].mean() * 100
+            fix_commits_pct = self.commits_data['has_fix_keyword'].mean() * 100
         
         peak_hour = hourly_commits.idxmax()
         peak_day = daily_commits.idxmax()
         
-        avg_message_length = self.commits_data['message_length'].mean()
-        short_commits_pct = self.commits_data['is_short_message'].mean() * 100
-        fix_commits_pct = self.commits_data['has_fix_keyword'].mean() * 100
-        
-        self.commits_data = self.commits_data.sort_values('date')
-        commits_by_date = self.commits_data.groupby(self.commits_data['date'].dt.date).size()
+        commits_by_date = self._commits_by_date()
         
         date_range = pd.date_range(
             start=commits_by_date.index.min(),
@@ -274,9 +537,10 @@ class GitHubAnalyzer:
         gaps.append(current_gap)
         longest_gap = max(gaps) if gaps else 0
         
+        activity = self.activity_summary()
         return {
-            'total_commits': len(self.commits_data),
-            'repos_with_commits': self.commits_data['repo_name'].nunique(),
+            'total_commits': activity['total_commits'],
+            'repos_with_commits': activity['active_repos'],
             'peak_hour': int(peak_hour),
             'peak_day': peak_day,
             'avg_message_length': float(avg_message_length),
@@ -294,34 +558,40 @@ class GitHubAnalyzer:
         if self.commits_data is None or self.commits_data.empty:
             return {}
         
+        if self.commit_summary is not None:
+            return self._approximate_message_analysis()
+        
         self.commits_data['processed_message'] = self.commits_data['message'].apply(safe_preprocess_text)
         
         all_words = " ".join(self.commits_data['processed_message']).split()
         word_freq = Counter(all_words).most_common(20)
         
-        action_words = ['add', 'update', 'fix', 'remove', 'implement', 'refactor', 'change', 'merge']
         action_counts = {
             word: sum(1 for msg in self.commits_data['message'] if re.search(fr'\b{word}\b', msg, re.IGNORECASE))
-            for word in action_words
+            for word in ACTION_WORDS
         }
         
         sentiment_dist = self.commits_data['sentiment'].describe().to_dict()
         
         repo_top_terms = {}
         if len(self.commits_data['repo_name'].unique()) > 1:
-            tfidf = TfidfVectorizer(max_features=100)
-            repo_messages = self.commits_data.groupby('repo_name')['processed_message'].apply(' '.join)
-            
-            if len(repo_messages) > 1:
-                try:
-                    tfidf_matrix = tfidf.fit_transform(repo_messages)
-                    feature_names = tfidf.get_feature_names_out()
-                    
-                    for i, repo in enumerate(repo_messages.index):
-                        tfidf_scores = zip(feature_names, tfidf_matrix[i].toarray()[0])
-                        repo_top_terms[repo] = sorted(tfidf_scores, key=lambda x: x[1], reverse=True)[:5]
-                except:
-                    pass
+            # Document frequencies persist per user in the shared cache, so only changed repos are re-vectorized
+            engine_key = f"terms:{self.cache_scope}:{self.username}:{int(self.hashing_terms)}"
+            cached_engine = self.cache.get(engine_key)
+            if cached_engine is not None:
+                engine = TermImportance.from_dict(cached_engine)
+            else:
+                engine = TermImportance(hashing=self.hashing_terms)
+            repo_messages = self.commits_data.groupby('repo_name')['processed_message']
+            # Only this request's repos form the corpus, so the IDF matches a fresh fit
+            changed = [engine.retain(repo_messages.groups.keys())]
+            changed += [engine.update(repo, messages.tolist()) for repo, messages in repo_messages]
+            if any(changed):
+                self.cache.set(engine_key, engine.to_dict())
+            for repo, _ in repo_messages:
+                terms = engine.top_terms(repo, 5)
+                if terms:
+                    repo_top_terms[repo] = terms
             
         return {
             'word_freq': word_freq,
@@ -330,12 +600,121 @@ class GitHubAnalyzer:
             'repo_top_terms': repo_top_terms
         }
     
+    def analyze_churn(self):
+        """Summarize lines added and removed per commit and per repository"""
+        if self.commits_data is None or self.commits_data.empty or 'churn' not in self.commits_data.columns:
+            return {}
+        
+        with_stats = self.commits_data.dropna(subset=['churn'])
+        missing = len(self.commits_data) - len(with_stats)
+        if with_stats.empty:
+            return self._label_churn_sample({
+                'commits_with_stats': 0,
+                'commits_missing_stats': int(missing)
+            })
+        
+        repo_churn = with_stats.groupby('repo_name').agg(
+            additions=('additions', 'sum'),
+            deletions=('deletions', 'sum'),
+            avg_churn=('churn', 'mean')
+        )
+        
+        largest = with_stats.nlargest(5, 'churn')
+        largest_commits = [{
+            'sha': row['sha'],
+            'repo_name': row['repo_name'],
+            'message': (row['message'] or '').split('\n')[0],
+            'additions': int(row['additions']),
+            'deletions': int(row['deletions']),
+            'churn': int(row['churn'])
+        } for _, row in largest.iterrows()]
+        
+        result = {
+            'commits_with_stats': int(len(with_stats)),
+            'commits_missing_stats': int(missing),
+            'total_additions': int(with_stats['additions'].sum()),
+            'total_deletions': int(with_stats['deletions'].sum()),
+            'avg_churn_per_commit': float(with_stats['churn'].mean()),
+            'median_churn_per_commit': float(with_stats['churn'].median()),
+            # A lower bound: GitHub lists at most 300 files per commit detail response
+            'avg_files_changed': float(with_stats['files_changed'].mean()),
+            'repo_churn': {
+                repo: {
+                    'additions': int(row['additions']),
+                    'deletions': int(row['deletions']),
+                    'avg_churn': float(row['avg_churn'])
+                } for repo, row in repo_churn.iterrows()
+            },
+            'largest_commits': largest_commits
+        }
+        return self._label_churn_sample(result)
+    
+    def _label_churn_sample(self, churn):
+        """Approximate mode only has stats for the reservoir sample, so say so"""
+        if self.commit_summary is not None:
+            churn['approximation'] = {
+                'sample_based': True,
+                'sample_size': int(len(self.commits_data)),
+                'commits_seen': self.commit_summary.total,
+                'truncated': self.commit_summary.truncated
+            }
+        return churn
+    
+    def _approximate_message_analysis(self):
+        """Message analysis from the stream sketches, with error bounds"""
+        summary = self.commit_summary
+        sentiment = self.commits_data['sentiment']
+        
+        return {
+            'word_freq': summary.word_freq(20),
+            'action_counts': dict(summary.action_counts),
+            'sentiment_dist': sentiment.describe().to_dict(),
+            'repo_top_terms': summary.repo_top_terms(5),
+            'approximation': {
+                'total_commits': summary.total,
+                'commits_seen': summary.total,
+                'truncated': summary.truncated,
+                'incomplete_repos': summary.incomplete_repos,
+                'sample_size': len(summary.sample.items),
+                'sentiment_mean_stderr': summary.sample.mean_standard_error(sentiment.to_numpy()),
+                'word_freq_max_overcount': summary.word_counts.max_error(),
+                'word_freq_count_min_overcount': summary.word_sketch.epsilon * summary.word_sketch.total,
+                'word_freq_count_min_confidence': 1 - summary.word_sketch.delta,
+                'distinct_terms': summary.distinct_words.count(),
+                'distinct_authors': summary.distinct_authors.count(),
+                'distinct_relative_error': summary.distinct_words.relative_error
+            }
+        }
+    
+    def _commits_by_date(self):
+        if self.commit_summary is not None:
+            return self.commit_summary.commits_by_date()
+        return self.commits_data.groupby(self.commits_data['date'].dt.date).size()
+    
+    def activity_summary(self):
+        """Commit totals across the fetched history"""
+        if self.commit_summary is not None:
+            summary = self.commit_summary
+            days_active = (summary.last_date - summary.first_date).days if summary.first_date is not None else 0
+            return {
+                'total_commits': summary.total,
+                'active_repos': len(summary.repos),
+                'days_active': int(days_active),
+                # total_commits only counts what was read when the walk stopped early
+                'truncated': summary.truncated
+            }
+        return {
+            'total_commits': len(self.commits_data),
+            'active_repos': int(self.commits_data['repo_name'].nunique()),
+            'days_active': int((self.commits_data['date'].max() - self.commits_data['date'].min()).days)
+        }
+    
     def predict_future_activity(self, days_to_predict=30):
         """Predict future commit activity using time series forecasting"""
         if self.commits_data is None or self.commits_data.empty:
             return {}
             
-        commits_by_date = self.commits_data.groupby(self.commits_data['date'].dt.date).size()
+        commits_by_date = self._commits_by_date()
         
         if len(commits_by_date) < 14:
             return {
@@ -439,6 +818,18 @@ class GitHubAnalyzer:
         for feature in features:
             if feature not in self.repos_data.columns:
                 return {}
+        
+        # Use per-repo churn as extra features when commit stats are available
+        if (self.commits_data is not None and not self.commits_data.empty
+                and 'churn' in self.commits_data.columns and self.commits_data['churn'].notna().any()):
+            repo_churn = self.commits_data.groupby('repo_name').agg(
+                avg_churn=('churn', 'mean'),
+                net_lines=('additions', 'sum')
+            )
+            repo_churn['net_lines'] -= self.commits_data.groupby('repo_name')['deletions'].sum()
+            self.repos_data = self.repos_data.drop(columns=['avg_churn', 'net_lines'], errors='ignore')
+            self.repos_data = self.repos_data.join(repo_churn, on='name')
+            features = features + ['avg_churn', 'net_lines']
                 
         X = self.repos_data[features].fillna(0)
         
@@ -482,6 +873,99 @@ class GitHubAnalyzer:
         cluster_profiles['name'] = cluster_names
         
         return {
-            'repos_with_clusters': self.repos_data[['name', 'stars', 'forks', 'open_issues', 'size', 'cluster']].to_dict('records'),
+            'repos_with_clusters': self.repos_data[['name'] + features + ['cluster']].fillna(0).to_dict('records'),
             'cluster_profiles': cluster_profiles.to_dict('records')
-        }
\ No newline at end of file
+        }
+    
+    def _stage_config(self):
+        """Constructor arguments for an equivalent analyzer in a worker process"""
+        return {
+            'username': self.username,
+            'token': self.token,
+            'base_url': self.base_url,
+            'churn_budget': self.churn_budget,
+            'churn_workers': self.churn_workers,
+            'approximate': self.approximate,
+            'sample_size': self.sample_size,
+            'approximate_max_pages': self.approximate_max_pages,
+            'approximate_time_budget': self.approximate_time_budget,
+            'hashing_terms': self.hashing_terms
+        }
+    
+    def full_analysis(self, max_repos=15, cluster_on_churn=False):
+        """Fetch everything and run every analysis. Raises LookupError when there is no data.
+        
+        Independent stages run concurrently and CPU-heavy ones use a process pool.
+        Clustering starts as soon as repositories arrive, overlapping with commit
+        fetching, unless cluster_on_churn makes it wait for commit churn features.
+        """
+        def fetch_repos():
+            repos_df = self.get_user_repos()
+            if repos_df is None or repos_df.empty:
+                raise LookupError('No repositories found')
+            return repos_df
+        
+        def fetch_commits(repos_data):
+            commits_df = self.get_all_commits(max_repos=max_repos, with_churn=True)
+            if commits_df is None or commits_df.empty:
+                raise LookupError('No commits found')
+            return commits_df, self.commit_summary
+        
+        def analysis(method, **kwargs):
+            return partial(_run_analysis_stage, method, self._stage_config(), **kwargs)
+        
+        commits = ('commits_data', 'commit_summary')
+        stages = [
+            Stage('fetch_repos', fetch_repos, outputs=('repos_data',)),
+            Stage('fetch_commits', fetch_commits, inputs=('repos_data',), outputs=commits),
+            Stage('patterns', analysis('analyze_commit_patterns'), inputs=commits, outputs=('commit_patterns',), cpu=True),
+            Stage('messages', analysis('analyze_commit_messages'), inputs=commits, outputs=('message_analysis',), cpu=True),
+            Stage('churn', analysis('analyze_churn'), inputs=commits, outputs=('churn',)),
+            Stage('clustering', analysis('cluster_repositories'),
+                  inputs=('repos_data',) + (commits if cluster_on_churn else ()), outputs=('clustering',), cpu=True),
+            Stage('predictions', analysis('predict_future_activity', days_to_predict=30),
+                  inputs=commits, outputs=('predictions',), cpu=True),
+            Stage('recommendations', self.generate_recommendations,
+                  inputs=('commit_patterns', 'message_analysis'), outputs=('recommendations',))
+        ]
+        
+        results = run_stages(stages, process_pool=get_process_pool())
+        repos_df = results['repos_data']
+        commits_df = results['commits_data']
+        
+        # Clustering ran on a copy of the repos, so copy the labels back
+        clusters = {repo['name']: repo['cluster'] for repo in results['clustering'].get('repos_with_clusters', [])}
+        repos_dict = repos_to_records(repos_df)
+        for repo in repos_dict:
+            if repo['name'] in clusters:
+                repo['cluster'] = clusters[repo['name']]
+        
+        summary = {
+            'total_repos': len(repos_df),
+            **self.activity_summary(),
+            'languages': repos_df['language'].value_counts().to_dict(),
+            'avg_stars': float(repos_df['stars'].mean()),
+            'avg_forks': float(repos_df['forks'].mean())
+        }
+        
+        return {
+            'summary': summary,
+            'repos': repos_dict,
+            'commits': commits_to_records(commits_df.head(100)),  # limit for performance
+            'patterns': results['commit_patterns'],
+            'message_analysis': results['message_analysis'],
+            'churn': results['churn'],
+            'clustering': results['clustering'],
+            'predictions': results['predictions'],
+            'recommendations': results['recommendations']
+        }
+
+
+def _run_analysis_stage(method, config, repos_data=None, commits_data=None, commit_summary=None, **kwargs):
+    """Run one analysis method on a fresh analyzer, possibly in a worker process"""
+    analyzer = GitHubAnalyzer(**config)
+    # Work on copies so concurrent stages never see each other's added columns
+    analyzer.repos_data = repos_data.copy() if repos_data is not None else None
+    analyzer.commits_data = commits_data.copy() if commits_data is not None else None
+    analyzer.commit_summary = commit_summary
+    return getattr(analyzer, method)(**kwargs)
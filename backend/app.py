@@ -1,9 +1,14 @@
 import os
+import threading
 from flask import Flask, jsonify, request
 from flask_cors import CORS
-from analyzer import GitHubAnalyzer
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError
+from analyzer import GitHubAnalyzer, repos_to_records, commits_to_records
 from auth import auth_bp
 from model import db
+from warmer import CacheWarmer, load_snapshot, save_snapshot
+from cache import get_cache
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -22,12 +27,48 @@ app.register_blueprint(auth_bp, url_prefix="/api/auth")
 
 with app.app_context():
     db.create_all()
+    # create_all does not add columns to tables created by older versions
+    user_columns = [c['name'] for c in inspect(db.engine).get_columns('user')]
+    if 'last_login' not in user_columns:
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(text('ALTER TABLE user ADD COLUMN last_login DATETIME'))
+        except OperationalError as e:
+            # Another worker booting at the same time added it first
+            if 'duplicate column' not in str(e).lower():
+                raise
+
+_warmer_lock = threading.Lock()
+_warmer_started = False
+
+@app.before_request
+def start_cache_warmer():
+    """Start the in-process warmer on the first request when CACHE_WARMER=inprocess.
+
+    Every gunicorn worker starts one, but CacheWarmer holds a lock file while
+    it runs a pass, so only one pass runs at a time across the node.
+    """
+    global _warmer_started
+    if _warmer_started or os.getenv('CACHE_WARMER') != 'inprocess':
+        return
+    with _warmer_lock:
+        if not _warmer_started:
+            threading.Thread(target=CacheWarmer(app).run_forever, daemon=True).start()
+            _warmer_started = True
 
 @app.route('/api/health', methods=['GET'])
 def health():
     """Health check endpoint"""
     return jsonify({'status': 'ok', 'message': 'API is running'})
 
+# Upper bound on commit detail requests a client may ask one churn request to spend
+MAX_CHURN_BUDGET = int(os.getenv('MAX_CHURN_BUDGET', 500))
+
+def get_churn_budget(data):
+    """Helper to read the churn budget from request JSON, clamped to the server maximum"""
+    budget = int(data.get('churn_budget', 200))
+    return max(0, min(budget, MAX_CHURN_BUDGET))
+
 def get_token(data):
     """Helper to get token from request JSON or .env"""
     token = data.get('token')
@@ -35,6 +76,11 @@ def get_token(data):
         token = os.getenv('GITHUB_TOKEN')
     return token
 
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Cache hit rates per tier for this worker"""
+    return jsonify({'pid': os.getpid(), 'tiers': get_cache().stats()})
+
 @app.route('/api/analyze/repos/<username>', methods=['POST'])
 def get_repos(username):
     """Get all repositories for a user"""
@@ -48,11 +94,7 @@ def get_repos(username):
         if repos_df is None or repos_df.empty:
             return jsonify({'error': 'No repositories found'}), 404
 
-        repos_dict = repos_df.to_dict('records')
-        for repo in repos_dict:
-            for key in ['created_at', 'updated_at', 'pushed_at']:
-                if key in repo and repo[key]:
-                    repo[key] = str(repo[key])
+        repos_dict = repos_to_records(repos_df)
 
         return jsonify({
             'repos': repos_dict,
@@ -69,23 +111,16 @@ def get_commits(username):
         token = get_token(data)
         max_repos = data.get('max_repos', 10)
 
-        analyzer = GitHubAnalyzer(username, token)
+        analyzer = GitHubAnalyzer(username, token, approximate=data.get('approximate', False))
         analyzer.get_user_repos()
         commits_df = analyzer.get_all_commits(max_repos=max_repos)
 
         if commits_df is None or commits_df.empty:
             return jsonify({'error': 'No commits found'}), 404
 
-        commits_dict = commits_df.to_dict('records')
-        for commit in commits_dict:
-            if 'date' in commit and commit['date']:
-                commit['date'] = str(commit['date'])
+        commits_dict = commits_to_records(commits_df)
 
-        stats = {
-            'total_commits': len(commits_df),
-            'active_repos': int(commits_df['repo_name'].nunique()),
-            'days_active': int((commits_df['date'].max() - commits_df['date'].min()).days)
-        }
+        stats = analyzer.activity_summary()
 
         return jsonify({
             'commits': commits_dict,
@@ -102,7 +137,7 @@ def get_commit_patterns(username):
         token = get_token(data)
         max_repos = data.get('max_repos', 10)
 
-        analyzer = GitHubAnalyzer(username, token)
+        analyzer = GitHubAnalyzer(username, token, approximate=data.get('approximate', False))
         analyzer.get_user_repos()
         analyzer.get_all_commits(max_repos=max_repos)
 
@@ -122,7 +157,7 @@ def get_message_analysis(username):
         token = get_token(data)
         max_repos = data.get('max_repos', 10)
 
-        analyzer = GitHubAnalyzer(username, token)
+        analyzer = GitHubAnalyzer(username, token, approximate=data.get('approximate', False))
         analyzer.get_user_repos()
         analyzer.get_all_commits(max_repos=max_repos)
 
@@ -134,19 +169,53 @@ def get_message_analysis(username):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/analyze/churn/<username>', methods=['POST'])
+def get_churn(username):
+    """Get lines added/removed analysis"""
+    try:
+        data = request.json or {}
+        token = get_token(data)
+        max_repos = data.get('max_repos', 10)
+        try:
+            churn_budget = get_churn_budget(data)
+        except (TypeError, ValueError, OverflowError):
+            return jsonify({'error': 'churn_budget must be an integer'}), 400
+
+        analyzer = GitHubAnalyzer(username, token, churn_budget=churn_budget,
+                                  approximate=data.get('approximate', False))
+        analyzer.get_user_repos()
+        analyzer.get_all_commits(max_repos=max_repos, with_churn=True)
+
+        if analyzer.commits_data is None or analyzer.commits_data.empty:
+            return jsonify({'error': 'No commit data available'}), 404
+
+        churn = analyzer.analyze_churn()
+        return jsonify(churn)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/analyze/clustering/<username>', methods=['POST'])
 def get_clustering(username):
-    """Get repository clustering analysis"""
+    """Get repository clustering analysis. with_churn adds per-repo churn features."""
     try:
         data = request.json or {}
         token = get_token(data)
+        max_repos = data.get('max_repos', 10)
+        with_churn = data.get('with_churn', False)
+        try:
+            churn_budget = get_churn_budget(data)
+        except (TypeError, ValueError, OverflowError):
+            return jsonify({'error': 'churn_budget must be an integer'}), 400
 
-        analyzer = GitHubAnalyzer(username, token)
+        analyzer = GitHubAnalyzer(username, token, churn_budget=churn_budget)
         analyzer.get_user_repos()
 
         if analyzer.repos_data is None or analyzer.repos_data.empty:
             return jsonify({'error': 'No repository data available'}), 404
 
+        if with_churn:
+            analyzer.get_all_commits(max_repos=max_repos, with_churn=True)
+
         clustering_results = analyzer.cluster_repositories()
         if not clustering_results:
             return jsonify({'error': 'Not enough data for clustering'}), 400
@@ -164,7 +233,7 @@ def get_predictions(username):
         days = data.get('days', 30)
         max_repos = data.get('max_repos', 10)
 
-        analyzer = GitHubAnalyzer(username, token)
+        analyzer = GitHubAnalyzer(username, token, approximate=data.get('approximate', False))
         analyzer.get_user_repos()
         analyzer.get_all_commits(max_repos=max_repos)
 
@@ -184,7 +253,7 @@ def get_recommendations(username):
         token = get_token(data)
         max_repos = data.get('max_repos', 10)
 
-        analyzer = GitHubAnalyzer(username, token)
+        analyzer = GitHubAnalyzer(username, token, approximate=data.get('approximate', False))
         analyzer.get_user_repos()
         analyzer.get_all_commits(max_repos=max_repos)
 
@@ -210,55 +279,26 @@ def full_analysis(username):
         data = request.json or {}
         token = get_token(data)
         max_repos = data.get('max_repos', 15)
-
-        analyzer = GitHubAnalyzer(username, token)
-        repos_df = analyzer.get_user_repos()
-        if repos_df is None or repos_df.empty:
-            return jsonify({'error': 'No repositories found'}), 404
-
-        commits_df = analyzer.get_all_commits(max_repos=max_repos)
-        if commits_df is None or commits_df.empty:
-            return jsonify({'error': 'No commits found'}), 404
-
-        commit_patterns = analyzer.analyze_commit_patterns()
-        message_analysis = analyzer.analyze_commit_messages()
-        clustering_results = analyzer.cluster_repositories()
-        predictions = analyzer.predict_future_activity(days_to_predict=30)
-        recommendations = analyzer.generate_recommendations(commit_patterns, message_analysis)
-
-        repos_dict = repos_df.to_dict('records')
-        for repo in repos_dict:
-            for key in ['created_at', 'updated_at', 'pushed_at']:
-                if key in repo and repo[key]:
-                    repo[key] = str(repo[key])
-
-        commits_dict = commits_df.to_dict('records')
-        for commit in commits_dict:
-            if 'date' in commit and commit['date']:
-                commit['date'] = str(commit['date'])
-
-        summary = {
-            'total_repos': len(repos_df),
-            'total_commits': len(commits_df),
-            'active_repos': int(commits_df['repo_name'].nunique()),
-            'days_active': int((commits_df['date'].max() - commits_df['date'].min()).days),
-            'languages': repos_df['language'].value_counts().to_dict(),
-            'avg_stars': float(repos_df['stars'].mean()),
-            'avg_forks': float(repos_df['forks'].mean())
-        }
-
-        result = {
-            'summary': summary,
-            'repos': repos_dict,
-            'commits': commits_dict[:100],  # limit for performance
-            'patterns': commit_patterns,
-            'message_analysis': message_analysis,
-            'clustering': clustering_results,
-            'predictions': predictions,
-            'recommendations': recommendations
-        }
-
-        return jsonify(result)
+        approximate = data.get('approximate', False)
+        cluster_on_churn = data.get('cluster_on_churn', False)
+
+        # Snapshots are computed with the server token and default options
+        use_snapshot = not (data.get('token') or approximate or cluster_on_churn or data.get('refresh'))
+        if use_snapshot:
+            payload = load_snapshot(username, max_repos)
+            if payload:
+                return app.response_class(payload, mimetype='application/json')
+
+        analyzer = GitHubAnalyzer(username, token, approximate=approximate)
+        try:
+            result = analyzer.full_analysis(max_repos=max_repos, cluster_on_churn=cluster_on_churn)
+        except LookupError as e:
+            return jsonify({'error': str(e)}), 404
+
+        payload = app.json.dumps(result)
+        if use_snapshot:
+            save_snapshot(username, max_repos, payload)
+        return app.response_class(payload, mimetype='application/json')
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify
 from werkzeug.security import generate_password_hash, check_password_hash
-from model import db, User
+from model import db, User, utcnow
 
 auth_bp = Blueprint("auth", __name__)
 
@@ -23,5 +23,7 @@ def login():
     password = data.get("password")
     user = User.query.filter_by(username=username).first()
     if user and check_password_hash(user.password_hash, password):
+        user.last_login = utcnow()
+        db.session.commit()
         return jsonify({"success": True, "message": "Logged in!"})
     return jsonify({"success": False, "message": "Invalid credentials"}), 401
@@ -0,0 +1,312 @@
+import os
+import json
+import math
+import time
+import zlib
+import struct
+import sqlite3
+import threading
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+NETWORK_ERRORS = (OSError, redis.RedisError) if redis else (OSError,)
+
+
+def serialize(value):
+    """Encode JSON-compatible data as compressed bytes.
+
+    Tiers are shared between processes and nodes, so values are plain data
+    rather than pickles that would execute code when loaded.
+    """
+    return zlib.compress(json.dumps(value, separators=(',', ':')).encode('utf-8'), 1)
+
+
+def deserialize(blob):
+    return json.loads(zlib.decompress(blob).decode('utf-8'))
+
+
+def expiry(ttl):
+    return time.time() + ttl if ttl else None
+
+
+class CacheBackend:
+    """A cache tier storing serialized values by string key"""
+    name = 'base'
+
+    def get_entry(self, key):
+        """Return (blob, expires_at) or None. expires_at is a Unix time or None for no expiry."""
+        raise NotImplementedError
+
+    def set_entry(self, key, blob, expires_at=None):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def get_bytes(self, key):
+        entry = self.get_entry(key)
+        return None if entry is None else entry[0]
+
+    def set_bytes(self, key, blob, ttl=None):
+        self.set_entry(key, blob, expiry(ttl))
+
+    def get(self, key):
+        blob = self.get_bytes(key)
+        return None if blob is None else deserialize(blob)
+
+    def set(self, key, value, ttl=None):
+        self.set_bytes(key, serialize(value), ttl)
+
+
+class LRUCache(CacheBackend):
+    name = 'memory'
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        """In-process LRU bounded by total serialized size"""
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get_entry(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] is not None and entry[1] < time.time():
+                self._remove(key)
+                return None
+            self.entries.move_to_end(key)
+            return entry
+
+    def set_entry(self, key, blob, expires_at=None):
+        if len(blob) > self.max_bytes:
+            return
+        with self.lock:
+            self._remove(key)
+            self.entries[key] = (blob, expires_at)
+            self.size += len(blob)
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+
+    def delete(self, key):
+        with self.lock:
+            self._remove(key)
+
+    def _remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[0])
+
+
+class SQLiteCache(CacheBackend):
+    name = 'sqlite'
+
+    def __init__(self, path=None, max_bytes=None, mmap_size=256 * 1024 * 1024, purge_interval=60):
+        """Node-local store shared by every worker process through one SQLite file.
+
+        Expired rows are purged every `purge_interval` seconds, and the oldest
+        rows are evicted once stored values exceed `max_bytes`.
+        """
+        self.path = path or os.getenv('CACHE_SQLITE_PATH') or os.path.join(os.getcwd(), "cache.db")
+        self.max_bytes = max_bytes or int(os.getenv('CACHE_SQLITE_MAX_BYTES', 512 * 1024 * 1024))
+        self.mmap_size = mmap_size
+        self.purge_interval = purge_interval
+        self.next_purge = 0
+        self.local = threading.local()
+        conn = self._conn()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache_entries '
+            '(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL, stored_at REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS cache_entries_stored_at ON cache_entries (stored_at)')
+        conn.commit()
+
+    def _conn(self):
+        # sqlite3 connections cannot be shared across threads or forked workers
+        conn = getattr(self.local, 'conn', None)
+        if conn is None or self.local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute(f'PRAGMA mmap_size={int(self.mmap_size)}')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self.local.conn = conn
+            self.local.pid = os.getpid()
+        return conn
+
+    def get_entry(self, key):
+        row = self._conn().execute('SELECT value, expires_at FROM cache_entries WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        if row[1] is not None and row[1] < time.time():
+            self.delete(key)
+            return None
+        return bytes(row[0]), row[1]
+
+    def set_entry(self, key, blob, expires_at=None):
+        conn = self._conn()
+        conn.execute(
+            'INSERT OR REPLACE INTO cache_entries (key, value, expires_at, stored_at) VALUES (?, ?, ?, ?)',
+            (key, sqlite3.Binary(blob), expires_at, time.time())
+        )
+        conn.commit()
+        if time.time() >= self.next_purge:
+            self.next_purge = time.time() + self.purge_interval
+            self.purge()
+
+    def delete(self, key):
+        conn = self._conn()
+        conn.execute('DELETE FROM cache_entries WHERE key = ?', (key,))
+        conn.commit()
+
+    def purge(self):
+        """Delete expired rows, then the oldest rows while the store is over max_bytes"""
+        conn = self._conn()
+        conn.execute('DELETE FROM cache_entries WHERE expires_at < ?', (time.time(),))
+        total, rows = conn.execute('SELECT COALESCE(SUM(LENGTH(value)), 0), COUNT(*) FROM cache_entries').fetchone()
+        while total > self.max_bytes and rows:
+            conn.execute(
+                'DELETE FROM cache_entries WHERE key IN '
+                '(SELECT key FROM cache_entries ORDER BY stored_at LIMIT ?)',
+                (max(1, rows // 10),)
+            )
+            total, rows = conn.execute('SELECT COALESCE(SUM(LENGTH(value)), 0), COUNT(*) FROM cache_entries').fetchone()
+        conn.commit()
+
+
+class InMemoryClient:
+    def __init__(self):
+        """Stand-in for a Redis client, for tests and single-node setups"""
+        self.data = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.time():
+                del self.data[key]
+                return None
+            return value
+
+    def set(self, key, value, ex=None):
+        with self.lock:
+            self.data[key] = (value, time.time() + ex if ex else None)
+
+    def delete(self, key):
+        with self.lock:
+            self.data.pop(key, None)
+
+
+class NetworkCache(CacheBackend):
+    name = 'network'
+    # Values are prefixed with their expiry time so a hit can be backfilled with the remaining lifetime
+    HEADER = struct.Struct('>d')
+
+    def __init__(self, client=None, url=None, prefix='gha:'):
+        """Store shared across nodes, using any client with Redis get/set/delete"""
+        if client is None:
+            if redis is None:
+                raise RuntimeError("The redis package is required for the network cache tier")
+            client = redis.Redis.from_url(url or os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0'))
+        self.client = client
+        self.prefix = prefix
+
+    # An unreachable network store degrades to a miss rather than failing the request
+    def get_entry(self, key):
+        try:
+            value = self.client.get(self.prefix + key)
+        except NETWORK_ERRORS:
+            return None
+        if value is None or len(value) < self.HEADER.size:
+            return None
+        expires_at = self.HEADER.unpack_from(value)[0] or None
+        if expires_at is not None and expires_at < time.time():
+            return None
+        return value[self.HEADER.size:], expires_at
+
+    def set_entry(self, key, blob, expires_at=None):
+        ex = None
+        if expires_at is not None:
+            ex = math.ceil(expires_at - time.time())
+            if ex <= 0:
+                return
+        try:
+            self.client.set(self.prefix + key, self.HEADER.pack(expires_at or 0) + blob, ex=ex)
+        except NETWORK_ERRORS:
+            pass
+
+    def delete(self, key):
+        try:
+            self.client.delete(self.prefix + key)
+        except NETWORK_ERRORS:
+            pass
+
+
+class TieredCache(CacheBackend):
+    name = 'tiered'
+
+    def __init__(self, tiers):
+        """Check tiers fastest first and backfill faster tiers on a hit"""
+        self.tiers = tiers
+        self.hits = {tier.name: 0 for tier in tiers}
+        self.misses = {tier.name: 0 for tier in tiers}
+        self.lock = threading.Lock()
+
+    def get_entry(self, key):
+        for i, tier in enumerate(self.tiers):
+            entry = tier.get_entry(key)
+            with self.lock:
+                if entry is None:
+                    self.misses[tier.name] += 1
+                    continue
+                self.hits[tier.name] += 1
+            # Backfilled copies expire together with the entry they came from
+            for faster in self.tiers[:i]:
+                faster.set_entry(key, *entry)
+            return entry
+        return None
+
+    def set_entry(self, key, blob, expires_at=None):
+        for tier in self.tiers:
+            tier.set_entry(key, blob, expires_at)
+
+    def delete(self, key):
+        for tier in self.tiers:
+            tier.delete(key)
+
+    def stats(self):
+        """Per-tier hit counts and hit rates for this process"""
+        with self.lock:
+            return {
+                tier.name: {
+                    'hits': self.hits[tier.name],
+                    'misses': self.misses[tier.name],
+                    'hit_rate': self.hits[tier.name] / (self.hits[tier.name] + self.misses[tier.name])
+                    if self.hits[tier.name] + self.misses[tier.name] else 0.0
+                } for tier in self.tiers
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def build_cache(tier_names):
+    tier_classes = {'memory': LRUCache, 'sqlite': SQLiteCache, 'network': NetworkCache}
+    return TieredCache([tier_classes[name.strip()]() for name in tier_names.split(',') if name.strip()])
+
+
+def get_cache():
+    """Process-wide cache, configured by CACHE_TIERS (default 'memory,sqlite')"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = build_cache(os.getenv('CACHE_TIERS', 'memory,sqlite'))
+        return _cache
@@ -0,0 +1,115 @@
+import os
+import re
+import json
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+SHA_PATTERN = re.compile(r'^[0-9a-f]{40}$')
+
+
+class CommitDetailCache:
+    def __init__(self, cache_dir=None):
+        """Permanent on-disk cache of per-commit stats keyed by sha"""
+        self.cache_dir = cache_dir or os.getenv('COMMIT_CACHE_DIR') or os.path.join(os.getcwd(), "commit_cache")
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, sha):
+        return os.path.join(self.cache_dir, sha[:2], f"{sha}.json")
+
+    def get(self, sha):
+        """Return cached stats for a commit, or None"""
+        if not isinstance(sha, str) or not SHA_PATTERN.match(sha):
+            return None
+        try:
+            with open(self._path(sha)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def set(self, sha, stats):
+        """Store stats for a commit. Commits are immutable so entries never expire."""
+        if not isinstance(sha, str) or not SHA_PATTERN.match(sha):
+            return
+        path = self._path(sha)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so concurrent workers never read a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(stats, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+def parse_commit_stats(commit):
+    """Extract churn stats from a /repos/{owner}/{repo}/commits/{sha} response.
+
+    GitHub lists at most 300 files in one response, so files_changed is a
+    lower bound for larger commits. additions and deletions cover the whole commit.
+    """
+    stats = commit.get('stats') or {}
+    return {
+        'additions': int(stats.get('additions', 0)),
+        'deletions': int(stats.get('deletions', 0)),
+        'files_changed': len(commit.get('files') or [])
+    }
+
+
+def fetch_commit_stats(base_url, headers, owner, commits, cache, max_workers=8, budget=200):
+    """Fetch churn stats for (repo_name, sha) pairs.
+
+    Cached commits are served from disk. At most `budget` uncached commits are
+    requested from the API, `max_workers` at a time. Fetching stops early once
+    GitHub reports the rate limit has been hit.
+    """
+    results = {}
+    missing = []
+    seen = set()
+    for repo_name, sha in commits:
+        if not sha or sha in seen:
+            continue
+        seen.add(sha)
+        cached = cache.get(sha)
+        if cached is not None:
+            results[sha] = cached
+        else:
+            missing.append((repo_name, sha))
+
+    to_fetch = missing[:max(budget, 0)]
+    if not to_fetch:
+        return results
+
+    rate_limited = threading.Event()
+    session = requests.Session()
+    session.headers.update(headers)
+
+    def fetch(item):
+        repo_name, sha = item
+        if rate_limited.is_set():
+            return sha, None
+        try:
+            response = session.get(f"{base_url}/repos/{owner}/{repo_name}/commits/{sha}", timeout=30)
+        except requests.RequestException:
+            return sha, None
+        if response.status_code in (403, 429):
+            rate_limited.set()
+            return sha, None
+        if response.status_code != 200:
+            return sha, None
+        stats = parse_commit_stats(response.json())
+        cache.set(sha, stats)
+        return sha, stats
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for sha, stats in executor.map(fetch, to_fetch):
+                if stats is not None:
+                    results[sha] = stats
+    finally:
+        session.close()
+
+    return results
@@ -1,11 +1,17 @@
+from datetime import datetime, timezone
 from flask_sqlalchemy import SQLAlchemy
 
 db = SQLAlchemy()
 
+def utcnow():
+    """Naive UTC timestamp, as stored by SQLite"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     password_hash = db.Column(db.String(200), nullable=False)
+    last_login = db.Column(db.DateTime, index=True)
     repos = db.relationship('Repo', backref='owner', lazy=True)
 
 class Repo(db.Model):
@@ -22,3 +28,11 @@ class Commit(db.Model):
     repo_id = db.Column(db.Integer, db.ForeignKey('repo.id'))
     message = db.Column(db.Text)
     date = db.Column(db.DateTime)
+
+class AnalysisSnapshot(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(80), nullable=False)
+    max_repos = db.Column(db.Integer, nullable=False)
+    payload = db.Column(db.Text, nullable=False)
+    computed_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+    __table_args__ = (db.UniqueConstraint('username', 'max_repos'),)
@@ -0,0 +1,148 @@
+import math
+import heapq
+import random
+import hashlib
+import numpy as np
+
+
+def hash64(value, seed=0):
+    """Stable 64-bit hash of a value"""
+    data = f"{seed}:{value}".encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'big')
+
+
+class ReservoirSample:
+    def __init__(self, capacity, seed=42):
+        """Uniform random sample of fixed size over a stream (Algorithm R)"""
+        self.capacity = capacity
+        self.items = []
+        self.seen = 0
+        self._random = random.Random(seed)
+
+    def add(self, item):
+        self.seen += 1
+        if len(self.items) < self.capacity:
+            self.items.append(item)
+        else:
+            j = self._random.randrange(self.seen)
+            if j < self.capacity:
+                self.items[j] = item
+
+    def mean_standard_error(self, values):
+        """Standard error of a sample mean, with finite population correction"""
+        n = len(values)
+        if n < 2 or self.seen == 0:
+            return 0.0
+        std = float(np.std(values, ddof=1))
+        fpc = math.sqrt((self.seen - n) / (self.seen - 1)) if self.seen > 1 else 0.0
+        return std / math.sqrt(n) * fpc
+
+
+class SpaceSaving:
+    def __init__(self, capacity):
+        """Heavy hitters with at most `capacity` counters.
+
+        Every reported count overestimates the true count by at most its
+        error, and every error is at most total / capacity.
+        """
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.total = 0
+        self._heap = []
+
+    def add(self, item, count=1):
+        self.total += count
+        if item in self.counts:
+            self.counts[item] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = count
+            self.errors[item] = 0
+        else:
+            evicted, min_count = self._pop_min()
+            del self.counts[evicted]
+            del self.errors[evicted]
+            self.counts[item] = min_count + count
+            self.errors[item] = min_count
+        heapq.heappush(self._heap, (self.counts[item], item))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(c, i) for i, c in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self):
+        # Heap entries go stale when a counter is incremented; skip those lazily
+        while True:
+            count, item = heapq.heappop(self._heap)
+            if self.counts.get(item) == count:
+                return item, count
+
+    def top(self, n):
+        """Return the n largest (item, count, error) triples"""
+        ranked = sorted(self.counts.items(), key=lambda x: x[1], reverse=True)[:n]
+        return [(item, count, self.errors[item]) for item, count in ranked]
+
+    def max_error(self):
+        return self.total / self.capacity if self.capacity else 0.0
+
+
+class CountMinSketch:
+    def __init__(self, width=2048, depth=5):
+        """Frequency estimates that never undercount.
+
+        Estimates exceed the true count by at most epsilon * total with
+        probability 1 - delta.
+        """
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+
+    def _indexes(self, item):
+        h = hash64(item)
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, item, count=1):
+        self.total += count
+        for row, col in enumerate(self._indexes(item)):
+            self.table[row, col] += count
+
+    def estimate(self, item):
+        return int(min(self.table[row, col] for row, col in enumerate(self._indexes(item))))
+
+    @property
+    def epsilon(self):
+        return math.e / self.width
+
+    @property
+    def delta(self):
+        return math.exp(-self.depth)
+
+
+class HyperLogLog:
+    def __init__(self, precision=12):
+        """Distinct count estimate using 2 ** precision registers"""
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def add(self, item):
+        h = hash64(item)
+        idx = h >> (64 - self.precision)
+        rest = h & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+
+    def count(self):
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimate = alpha * self.m * self.m / float(np.sum(np.power(2.0, -self.registers.astype(np.float64))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        # Linear counting is more accurate for small cardinalities
+        if estimate <= 2.5 * self.m and zeros:
+            estimate = self.m * math.log(self.m / zeros)
+        return int(round(estimate))
+
+    @property
+    def relative_error(self):
+        return 1.04 / math.sqrt(self.m)
@@ -0,0 +1,112 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+
+class Stage:
+    def __init__(self, name, fn, inputs=(), outputs=(), cpu=False):
+        """A unit of work that reads named inputs and produces named outputs.
+
+        fn is called with the inputs as keyword arguments and returns a single
+        value, or a tuple when there are several outputs. CPU-bound stages run
+        in worker processes, so their fn and inputs must be picklable.
+        """
+        self.name = name
+        self.fn = fn
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.cpu = cpu
+
+
+def run_stages(stages, values=None, thread_workers=4, process_pool=None):
+    """Run each stage as soon as its inputs exist. Returns every named value.
+
+    If a worker process dies the pool is discarded and the affected stages,
+    and every later CPU-bound stage, run on threads instead.
+    """
+    values = dict(values or {})
+    available = set(values) | {name for stage in stages for name in stage.outputs}
+    for stage in stages:
+        missing = set(stage.inputs) - available
+        if missing:
+            raise ValueError(f"Stage {stage.name} needs {sorted(missing)}, which no stage produces")
+
+    pending = list(stages)
+    running = {}
+    retried = set()
+    with ThreadPoolExecutor(max_workers=thread_workers) as threads:
+        def submit(stage):
+            nonlocal process_pool
+            kwargs = {name: values[name] for name in stage.inputs}
+            if stage.cpu and process_pool is not None:
+                try:
+                    return process_pool.submit(stage.fn, **kwargs)
+                except BrokenProcessPool:
+                    discard_process_pool(process_pool)
+                    process_pool = None
+            return threads.submit(stage.fn, **kwargs)
+
+        try:
+            while pending or running:
+                for stage in [s for s in pending if all(name in values for name in s.inputs)]:
+                    pending.remove(stage)
+                    running[submit(stage)] = stage
+
+                if not running:
+                    raise ValueError(f"Stages {[s.name for s in pending]} depend on each other")
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool:
+                        if not stage.cpu or stage.name in retried:
+                            raise
+                        retried.add(stage.name)
+                        if process_pool is not None:
+                            discard_process_pool(process_pool)
+                            process_pool = None
+                        running[submit(stage)] = stage
+                        continue
+                    if len(stage.outputs) == 1:
+                        result = (result,)
+                    values.update(zip(stage.outputs, result or ()))
+        except BaseException:
+            for future in running:
+                future.cancel()
+            raise
+    return values
+
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool():
+    """Shared pool for CPU-bound stages, or None when ANALYSIS_PROCESSES=0"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            workers = int(os.getenv('ANALYSIS_PROCESSES', min(4, os.cpu_count() or 1)))
+            if workers <= 0:
+                return None
+            # Forking a process that is running fetch threads can deadlock, so start clean workers
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            ctx = multiprocessing.get_context(method)
+            if method == 'forkserver':
+                # Load the analysis modules once in the server instead of re-running the web app's __main__
+                ctx.set_forkserver_preload(['analyzer'])
+            _process_pool = ProcessPoolExecutor(max_workers=workers, mp_context=ctx)
+        return _process_pool
+
+
+def discard_process_pool(pool):
+    """Drop a broken pool so the next get_process_pool() call starts a fresh one"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is pool:
+            _process_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
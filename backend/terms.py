@@ -0,0 +1,173 @@
+import hashlib
+import threading
+from collections import Counter
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer
+
+
+def top_k_sparse(indices, scores, k):
+    """Return the columns and scores of the k largest entries of a sparse row, best first"""
+    if len(scores) > k:
+        candidates = np.argpartition(scores, -k)[-k:]
+    else:
+        candidates = np.arange(len(scores))
+    order = candidates[np.argsort(scores[candidates])[::-1]]
+    return indices[order], scores[order]
+
+
+class TermImportance:
+    def __init__(self, hashing=False, n_features=2 ** 18):
+        """Incremental TF-IDF over a corpus where each repository is one document.
+
+        Document frequencies are maintained as repositories are added or
+        replaced, so updating one repository never refits the others. With
+        hashing=True terms are mapped by HashingVectorizer and no vocabulary
+        pass is needed.
+        """
+        self.hashing = hashing
+        self.n_features = n_features
+        if hashing:
+            self.vectorizer = HashingVectorizer(n_features=n_features, alternate_sign=False, norm=None)
+        else:
+            self.vectorizer = CountVectorizer()
+        self.analyzer = self.vectorizer.build_analyzer()
+
+        self.vocabulary = {}
+        self.terms = {}
+        self.doc_freq = np.zeros(n_features if hashing else 0, dtype=np.int64)
+        self.rows = {}
+        self.fingerprints = {}
+        self.lock = threading.Lock()
+
+    def to_dict(self):
+        """Plain-data encoding for the shared cache. The vectorizer is rebuilt on load."""
+        with self.lock:
+            nonzero = np.flatnonzero(self.doc_freq)
+            return {
+                'hashing': self.hashing,
+                'n_features': self.n_features,
+                'size': len(self.doc_freq),
+                'terms': [[int(c), t] for c, t in self.terms.items()],
+                'doc_freq': [nonzero.tolist(), self.doc_freq[nonzero].tolist()],
+                'rows': {repo: [c.tolist(), v.tolist()] for repo, (c, v) in self.rows.items()},
+                'fingerprints': self.fingerprints
+            }
+
+    @classmethod
+    def from_dict(cls, data):
+        engine = cls(hashing=data['hashing'], n_features=data['n_features'])
+        engine.terms = {c: t for c, t in data['terms']}
+        if not engine.hashing:
+            engine.vocabulary = {t: c for c, t in engine.terms.items()}
+        engine.doc_freq = np.zeros(data['size'], dtype=np.int64)
+        columns, counts = data['doc_freq']
+        engine.doc_freq[np.array(columns, dtype=np.int64)] = counts
+        engine.rows = {
+            repo: (np.array(c, dtype=np.int64), np.array(v, dtype=np.float64))
+            for repo, (c, v) in data['rows'].items()
+        }
+        engine.fingerprints = dict(data['fingerprints'])
+        return engine
+
+    def _vectorize(self, documents):
+        """Term counts for a list of documents as a (columns, counts) sparse row"""
+        counts = Counter(token for doc in documents for token in self.analyzer(doc))
+        if self.hashing:
+            if not counts:
+                return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+            # Hash each distinct token once instead of re-tokenizing the documents
+            tokens = list(counts)
+            hashed = self.vectorizer.transform(tokens)
+            token_columns = hashed.indices[hashed.indptr[:-1]].astype(np.int64)
+            columns, inverse = np.unique(token_columns, return_inverse=True)
+            values = np.bincount(inverse, weights=np.array([counts[t] for t in tokens], dtype=np.float64))
+            # Remember a name for each new hashed column so top terms stay readable
+            for token, column in zip(tokens, token_columns.tolist()):
+                if column not in self.terms:
+                    self.terms[column] = token
+            return columns, values
+
+        for token in counts:
+            if token not in self.vocabulary:
+                self.vocabulary[token] = len(self.vocabulary)
+                self.terms[self.vocabulary[token]] = token
+        if len(self.vocabulary) > len(self.doc_freq):
+            self.doc_freq = np.concatenate([
+                self.doc_freq,
+                np.zeros(len(self.vocabulary) - len(self.doc_freq), dtype=np.int64)
+            ])
+        columns = np.array([self.vocabulary[t] for t in counts], dtype=np.int64)
+        values = np.array(list(counts.values()), dtype=np.float64)
+        order = np.argsort(columns)
+        return columns[order], values[order]
+
+    def update(self, repo, documents):
+        """Replace a repository's documents. Returns False if they were unchanged."""
+        documents = [doc for doc in documents if doc]
+        fingerprint = hashlib.sha1('\n'.join(documents).encode('utf-8')).hexdigest()
+        with self.lock:
+            if self.fingerprints.get(repo) == fingerprint:
+                return False
+            columns, values = self._vectorize(documents)
+            previous = self.rows.get(repo)
+            if previous is not None:
+                self.doc_freq[previous[0]] -= 1
+            self.doc_freq[columns] += 1
+            self.rows[repo] = (columns, values)
+            self.fingerprints[repo] = fingerprint
+            if previous is not None:
+                # Terms that rolled out of this repository's window may now be unused
+                self._prune(previous[0])
+            return True
+
+    def retain(self, repos):
+        """Drop repositories not in `repos`, so the corpus is exactly the current request's.
+
+        Returns True if anything was removed.
+        """
+        repos = set(repos)
+        with self.lock:
+            removed = [repo for repo in self.rows if repo not in repos]
+            dropped = []
+            for repo in removed:
+                columns, _ = self.rows.pop(repo)
+                self.doc_freq[columns] -= 1
+                del self.fingerprints[repo]
+                dropped.append(columns)
+            if removed:
+                self._prune(np.concatenate(dropped))
+            return bool(removed)
+
+    def _prune(self, columns):
+        """Forget the terms among `columns` that no remaining repository uses"""
+        dead = columns[self.doc_freq[columns] == 0]
+        if not len(dead):
+            return
+        if self.hashing:
+            for column in dead.tolist():
+                self.terms.pop(column, None)
+            return
+
+        # Renumber the vocabulary densely and remap every row to the new columns
+        live = np.flatnonzero(self.doc_freq > 0)
+        mapping = np.full(len(self.doc_freq), -1, dtype=np.int64)
+        mapping[live] = np.arange(len(live))
+        self.terms = {int(mapping[c]): self.terms[int(c)] for c in live}
+        self.vocabulary = {t: c for c, t in self.terms.items()}
+        self.doc_freq = self.doc_freq[live]
+        for repo, (columns, values) in self.rows.items():
+            self.rows[repo] = (mapping[columns], values)
+
+    def top_terms(self, repo, k=5):
+        """Top k (term, tfidf) pairs for a repository"""
+        with self.lock:
+            row = self.rows.get(repo)
+            if row is None or not len(row[0]):
+                return []
+            columns, values = row
+            n_docs = len(self.rows)
+            idf = np.log((1 + n_docs) / (1 + self.doc_freq[columns])) + 1
+            scores = values * idf
+            scores = scores / np.linalg.norm(scores)
+            top_columns, top_scores = top_k_sparse(columns, scores, k)
+            return [(self.terms[int(c)], float(s)) for c, s in zip(top_columns, top_scores)]
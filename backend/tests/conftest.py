@@ -0,0 +1,88 @@
+import os
+import sys
+import json
+import hashlib
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class StubGitHub:
+    def __init__(self):
+        """Local stand-in for the GitHub API.
+
+        Handlers are registered per path and called with the query string;
+        they return (status, body). Every request path is recorded in `calls`.
+        """
+        self.routes = {}
+        self.calls = []
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+                with stub.lock:
+                    stub.calls.append(url.path)
+                handler = stub.routes.get(url.path)
+                status, body = handler(query) if handler else (404, {'message': 'Not Found'})
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def route(self, path, handler):
+        self.routes[path] = handler
+
+    def count(self, path):
+        with self.lock:
+            return self.calls.count(path)
+
+
+def make_repo(i, name):
+    return {
+        'id': i, 'name': name, 'description': '', 'language': 'Python',
+        'created_at': '2023-01-01T00:00:00Z', 'updated_at': '2024-01-01T00:00:00Z', 'pushed_at': '2024-01-01T00:00:00Z',
+        'stargazers_count': i * 3, 'forks_count': i, 'open_issues_count': i, 'size': 100 * i,
+        'fork': False, 'html_url': f"https://github.com/me/{name}", 'topics': [], 'default_branch': 'main'
+    }
+
+
+def make_commit(repo, i):
+    return {
+        'sha': hashlib.sha1(f"{repo}/{i}".encode('utf-8')).hexdigest(),
+        'html_url': f"https://github.com/me/{repo}/commit/{i}",
+        'commit': {
+            'message': f"fix parser bug {i}" if i % 2 else f"add cache layer {i}",
+            'author': {'name': 'me', 'email': 'me@example.com', 'date': f"2024-01-{1 + i % 28:02d}T{i % 24:02d}:00:00Z"}
+        },
+        'author': {'login': 'me'},
+        'parents': [{'sha': '0' * 40}]
+    }
+
+
+@pytest.fixture(autouse=True)
+def commit_cache_dir(tmp_path, monkeypatch):
+    # Keep the on-disk commit stats cache out of the working directory
+    monkeypatch.setenv('COMMIT_CACHE_DIR', str(tmp_path / 'commit_cache'))
+
+
+@pytest.fixture
+def github_api():
+    stub = StubGitHub()
+    yield stub
+    stub.server.shutdown()
+    stub.server.server_close()
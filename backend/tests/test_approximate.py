@@ -0,0 +1,66 @@
+from analyzer import GitHubAnalyzer
+from cache import LRUCache
+from conftest import make_repo, make_commit
+
+HISTORY = {name: [make_commit(name, i) for i in range(250)] for name in ('short', 'long')}
+
+
+def serve_history(github_api, failing_page=None):
+    github_api.route('/user/repos', lambda query: (200, [make_repo(i, name) for i, name in enumerate(HISTORY)]))
+    for name, commits in HISTORY.items():
+        def listing(query, commits=commits, name=name):
+            page, per_page = int(query['page']), int(query['per_page'])
+            if name == 'long' and page == failing_page:
+                return 502, {'message': 'Server Error'}
+            return 200, commits[(page - 1) * per_page:page * per_page]
+        github_api.route(f"/repos/me/{name}/commits", listing)
+
+
+def analyzer_for(github_api, **kwargs):
+    return GitHubAnalyzer('me', 'token', base_url=github_api.url, approximate=True, sample_size=50,
+                          cache=LRUCache(), **kwargs)
+
+
+def test_complete_walk_is_not_truncated(github_api):
+    serve_history(github_api)
+    analyzer = analyzer_for(github_api, approximate_max_pages=0)
+    analyzer.get_all_commits()
+
+    approximation = analyzer.analyze_commit_messages()['approximation']
+    assert approximation['commits_seen'] == 500
+    assert not approximation['truncated']
+    assert not analyzer.activity_summary()['truncated']
+
+
+def test_page_limit_and_errors_are_reported(github_api):
+    serve_history(github_api, failing_page=2)
+    analyzer = analyzer_for(github_api, approximate_max_pages=2)
+    analyzer.get_all_commits()
+
+    approximation = analyzer.analyze_commit_messages()['approximation']
+    assert approximation['commits_seen'] == 300
+    assert approximation['truncated']
+    assert approximation['incomplete_repos'] == {'short': 'page_limit', 'long': 'http_502'}
+    activity = analyzer.activity_summary()
+    assert activity['total_commits'] == 300
+    assert activity['truncated']
+
+
+def test_time_budget_stops_the_walk(github_api):
+    serve_history(github_api)
+    analyzer = analyzer_for(github_api, approximate_time_budget=1e-9)
+    analyzer.get_all_commits()
+
+    assert analyzer.commit_summary.total == 0
+    assert analyzer.commit_summary.incomplete_repos == {'short': 'time_limit', 'long': 'time_limit'}
+
+
+def test_churn_from_a_sample_is_labelled(github_api):
+    serve_history(github_api)
+    analyzer = analyzer_for(github_api, churn_budget=0)
+    analyzer.get_all_commits(with_churn=True)
+
+    approximation = analyzer.analyze_churn()['approximation']
+    assert approximation['sample_based']
+    assert approximation['sample_size'] == 50
+    assert approximation['commits_seen'] == 500
@@ -0,0 +1,40 @@
+import time
+
+from cache import LRUCache, SQLiteCache, NetworkCache, InMemoryClient, TieredCache, serialize, deserialize
+
+
+def test_values_round_trip_as_json():
+    value = {'repos': [{'name': 'a', 'stars': 3}], 'payload': '{"x": 1}'}
+    assert deserialize(serialize(value)) == value
+
+
+def test_backfill_keeps_the_source_expiry(tmp_path):
+    memory = LRUCache()
+    network = NetworkCache(client=InMemoryClient())
+    cache = TieredCache([memory, SQLiteCache(path=str(tmp_path / 'cache.db')), network])
+
+    network.set('key', [1, 2], ttl=2)
+    source_expiry = network.get_entry('key')[1]
+    assert cache.get('key') == [1, 2]
+    assert memory.get_entry('key')[1] == source_expiry
+    assert cache.stats()['network']['hits'] == 1
+
+    time.sleep(2.1)
+    assert memory.get('key') is None
+    assert cache.get('key') is None
+
+
+def test_sqlite_purges_expired_rows_and_caps_size(tmp_path):
+    store = SQLiteCache(path=str(tmp_path / 'cache.db'), max_bytes=20000, purge_interval=3600)
+    store.set_bytes('expired', b'x' * 100, ttl=0.01)
+    time.sleep(0.05)
+    for i in range(50):
+        store.set_bytes(f"page:{i}", bytes(1000))
+    store.purge()
+
+    count, total = store._conn().execute('SELECT COUNT(*), SUM(LENGTH(value)) FROM cache_entries').fetchone()
+    assert total <= 20000
+    assert store.get_bytes('expired') is None
+    # The newest entries survive eviction
+    assert store.get_bytes('page:49') is not None
+    assert store.get_bytes('page:0') is None
@@ -0,0 +1,68 @@
+import numpy as np
+
+from analyzer import GitHubAnalyzer
+from cache import LRUCache
+from churn import CommitDetailCache, fetch_commit_stats
+from conftest import make_repo, make_commit
+
+COMMITS = [make_commit('tools', i) for i in range(6)]
+
+
+def detail_path(commit):
+    return f"/repos/me/tools/commits/{commit['sha']}"
+
+
+def serve_details(github_api, status=200):
+    for i, commit in enumerate(COMMITS):
+        body = {'sha': commit['sha'], 'stats': {'additions': 10 * i, 'deletions': i}, 'files': [{}] * (i + 1)}
+        github_api.route(detail_path(commit), lambda query, body=body: (status, body))
+
+
+def test_fetch_spends_at_most_the_budget(github_api, tmp_path):
+    serve_details(github_api)
+    pairs = [('tools', commit['sha']) for commit in COMMITS]
+    stats = fetch_commit_stats(github_api.url, {}, 'me', pairs, CommitDetailCache(str(tmp_path)), budget=4)
+
+    assert len(stats) == 4
+    assert sum(github_api.count(detail_path(commit)) for commit in COMMITS) == 4
+    assert stats[COMMITS[2]['sha']] == {'additions': 20, 'deletions': 2, 'files_changed': 3}
+
+
+def test_cached_commits_skip_the_api(github_api, tmp_path):
+    serve_details(github_api)
+    cache = CommitDetailCache(str(tmp_path))
+    cache.set(COMMITS[0]['sha'], {'additions': 7, 'deletions': 7, 'files_changed': 1})
+    pairs = [('tools', commit['sha']) for commit in COMMITS[:3]]
+    stats = fetch_commit_stats(github_api.url, {}, 'me', pairs, cache, budget=2)
+
+    # The cached commit does not count against the budget
+    assert len(stats) == 3
+    assert stats[COMMITS[0]['sha']]['additions'] == 7
+    assert github_api.count(detail_path(COMMITS[0])) == 0
+    assert cache.get(COMMITS[1]['sha']) == stats[COMMITS[1]['sha']]
+
+
+def test_rate_limit_stops_fetching(github_api, tmp_path):
+    serve_details(github_api, status=403)
+    pairs = [('tools', commit['sha']) for commit in COMMITS]
+    stats = fetch_commit_stats(github_api.url, {}, 'me', pairs, CommitDetailCache(str(tmp_path)), max_workers=1)
+
+    assert stats == {}
+    assert sum(github_api.count(detail_path(commit)) for commit in COMMITS) == 1
+
+
+def test_commits_over_budget_have_no_churn(github_api, tmp_path):
+    serve_details(github_api)
+    github_api.route('/user/repos', lambda query: (200, [make_repo(0, 'tools')]))
+    github_api.route('/repos/me/tools/commits', lambda query: (200, COMMITS if query.get('page') == '1' else []))
+
+    analyzer = GitHubAnalyzer('me', 'token', base_url=github_api.url, churn_budget=2, cache=LRUCache())
+    analyzer.commit_cache = CommitDetailCache(str(tmp_path))
+    commits_df = analyzer.get_all_commits(with_churn=True)
+
+    assert commits_df['churn'].notna().sum() == 2
+    assert np.isnan(commits_df['churn']).sum() == 4
+    churn = analyzer.analyze_churn()
+    assert churn['commits_with_stats'] == 2
+    assert churn['commits_missing_stats'] == 4
+
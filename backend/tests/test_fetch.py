@@ -0,0 +1,40 @@
+from analyzer import GitHubAnalyzer
+from cache import LRUCache
+from conftest import make_repo, make_commit
+
+
+def test_failed_repo_listing_is_not_cached(github_api):
+    responses = iter([(403, {'message': 'API rate limit exceeded'}), (200, [make_repo(1, 'tools')])])
+    github_api.route('/user/repos', lambda query: next(responses))
+    cache = LRUCache()
+
+    assert GitHubAnalyzer('me', 'token', base_url=github_api.url, cache=cache).get_user_repos().empty
+    repos_df = GitHubAnalyzer('me', 'token', base_url=github_api.url, cache=cache).get_user_repos()
+    assert repos_df['name'].tolist() == ['tools']
+
+    # The complete listing is served from the cache
+    assert len(GitHubAnalyzer('me', 'token', base_url=github_api.url, cache=cache).get_user_repos()) == 1
+    assert github_api.count('/user/repos') == 2
+
+
+def test_commit_pages_cache_only_the_used_fields(github_api):
+    commits = [make_commit('tools', i) for i in range(3)]
+    github_api.route('/repos/me/tools/commits', lambda query: (200, commits))
+    cache = LRUCache()
+    analyzer = GitHubAnalyzer('me', 'token', base_url=github_api.url, cache=cache)
+
+    fetched = analyzer.get_commits_for_repo('tools')
+    assert analyzer.get_commits_for_repo('tools') == fetched
+    assert github_api.count('/repos/me/tools/commits') == 1
+    cached = cache.get(f"commit_page:{analyzer.cache_scope}:me/tools:50:1")
+    assert cached == fetched
+    assert set(cached[0]) == {'repo_name', 'sha', 'message', 'author_name', 'author_email', 'date', 'url'}
+
+
+def test_unbounded_walk_is_not_cached(github_api):
+    github_api.route('/repos/me/tools/commits', lambda query: (200, [make_commit('tools', 0)]))
+    cache = LRUCache()
+    analyzer = GitHubAnalyzer('me', 'token', base_url=github_api.url, cache=cache)
+
+    assert len(list(analyzer.iter_commits_for_repo('tools', max_pages=None))) == 1
+    assert cache.size == 0
@@ -0,0 +1,66 @@
+import random
+from collections import Counter
+
+from analyzer import CommitStreamSummary
+from sketches import SpaceSaving, HyperLogLog
+
+
+def make_commits(n, vocabulary, authors, seed=0):
+    rng = random.Random(seed)
+    # Zipf-like word distribution so there are clear heavy hitters
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    for i in range(n):
+        words = rng.choices(vocabulary, weights=weights, k=4)
+        yield {
+            'repo_name': f"repo{i % 3}",
+            'sha': f"{i:040x}",
+            'message': ' '.join(words),
+            'author_name': None,
+            'author_email': f"{rng.randrange(authors)}@example.com",
+            'date': f"2024-01-{1 + i % 28:02d}T{i % 24:02d}:00:00Z"
+        }
+
+
+def test_space_saving_overcount_bound_on_large_stream():
+    rng = random.Random(1)
+    sketch = SpaceSaving(capacity=50)
+    truth = Counter()
+    for _ in range(20000):
+        item = int(rng.paretovariate(1.2)) % 2000
+        sketch.add(item)
+        truth[item] += 1
+
+    assert len(sketch.counts) == 50
+    for item, count, error in sketch.top(20):
+        assert truth[item] <= count
+        assert count - truth[item] <= error <= sketch.max_error()
+
+
+def test_hyperloglog_within_reported_error():
+    hll = HyperLogLog(precision=10)
+    for i in range(50000):
+        hll.add(f"item-{i}")
+    assert abs(hll.count() - 50000) / 50000 <= 3 * hll.relative_error
+
+
+def test_commit_summary_reports_bounds_beyond_capacity():
+    vocabulary = [f"term{i}" for i in range(3000)]
+    commits = list(make_commits(6000, vocabulary, authors=2500))
+    summary = CommitStreamSummary(sample_size=500, top_k=200, repo_top_k=50, hll_precision=10)
+    for commit in commits:
+        summary.add(commit)
+
+    assert summary.total == 6000
+    assert len(summary.sample.items) == 500
+    assert len(summary.word_counts.counts) == 200
+
+    truth = Counter(word for commit in commits for word in commit['message'].split())
+    max_overcount = summary.word_counts.max_error()
+    for word, count in summary.word_freq(20):
+        assert truth[word] <= count <= truth[word] + max_overcount
+
+    relative_error = summary.distinct_authors.relative_error
+    distinct_authors = len({commit['author_email'] for commit in commits})
+    assert abs(summary.distinct_authors.count() - distinct_authors) / distinct_authors <= 3 * relative_error
+    distinct_words = len(truth)
+    assert abs(summary.distinct_words.count() - distinct_words) / distinct_words <= 3 * relative_error
@@ -0,0 +1,23 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from stages import Stage, run_stages
+
+
+def crash_in_worker(**inputs):
+    # Simulates a worker killed mid-task (e.g. by the OOM killer)
+    if multiprocessing.parent_process() is not None:
+        os._exit(1)
+    return sum(inputs.values()) * 2
+
+
+def test_broken_process_pool_falls_back_to_threads():
+    pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+    stages = [
+        Stage('double', crash_in_worker, inputs=('x',), outputs=('doubled',), cpu=True),
+        Stage('again', crash_in_worker, inputs=('doubled',), outputs=('quadrupled',), cpu=True)
+    ]
+    results = run_stages(stages, {'x': 3}, process_pool=pool)
+    assert results['doubled'] == 6
+    assert results['quadrupled'] == 12
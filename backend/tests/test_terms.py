@@ -0,0 +1,96 @@
+import json
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from terms import TermImportance
+
+DOCS = {
+    'parser': ["fix parser bug", "add parser cache", "parser speedup"],
+    'docs': ["update docs", "fix docs typo", "docs for cache"],
+    'api': ["add login api", "api login fix", "rate limit api"],
+    'ui': ["dark mode", "fix layout bug"],
+}
+
+
+def sklearn_scores(docs):
+    tfidf = TfidfVectorizer(smooth_idf=True)
+    matrix = tfidf.fit_transform([' '.join(messages) for messages in docs.values()])
+    names = tfidf.get_feature_names_out()
+    return {
+        repo: {names[c]: v for c, v in zip(matrix[i].indices, matrix[i].data)}
+        for i, repo in enumerate(docs)
+    }
+
+
+def assert_matches_sklearn(engine, docs):
+    expected = sklearn_scores(docs)
+    for repo in docs:
+        scores = dict(engine.top_terms(repo, k=1000))
+        assert scores.keys() == expected[repo].keys()
+        for term, value in scores.items():
+            assert value == pytest.approx(expected[repo][term])
+
+
+@pytest.mark.parametrize('hashing', [False, True])
+def test_top_terms_match_tfidf_vectorizer(hashing):
+    engine = TermImportance(hashing=hashing)
+    for repo, messages in DOCS.items():
+        engine.update(repo, messages)
+    assert_matches_sklearn(engine, DOCS)
+
+
+@pytest.mark.parametrize('hashing', [False, True])
+def test_retain_and_update_match_a_fresh_fit(hashing):
+    engine = TermImportance(hashing=hashing)
+    for repo, messages in DOCS.items():
+        engine.update(repo, messages)
+
+    current = {'parser': DOCS['parser'] + ["rewrite tokenizer"], 'api': DOCS['api']}
+    assert engine.retain(current)
+    for repo, messages in current.items():
+        engine.update(repo, messages)
+
+    assert set(engine.rows) == set(current)
+    assert_matches_sklearn(engine, current)
+    # Terms only used by the dropped repos are forgotten
+    assert 'typo' not in engine.terms.values()
+    assert 'layout' not in engine.terms.values()
+
+
+def test_top_terms_are_sorted_and_limited():
+    engine = TermImportance()
+    for repo, messages in DOCS.items():
+        engine.update(repo, messages)
+    top = engine.top_terms('parser', k=2)
+    assert len(top) == 2
+    assert top[0][0] == 'parser'
+    assert top[0][1] >= top[1][1]
+
+
+@pytest.mark.parametrize('hashing', [False, True])
+def test_cache_encoding_round_trip(hashing):
+    engine = TermImportance(hashing=hashing)
+    for repo, messages in DOCS.items():
+        engine.update(repo, messages)
+    engine.retain(['parser', 'api', 'ui'])
+
+    restored = TermImportance.from_dict(json.loads(json.dumps(engine.to_dict())))
+    assert not restored.update('parser', DOCS['parser'])
+    assert_matches_sklearn(restored, {repo: DOCS[repo] for repo in ['parser', 'api', 'ui']})
+
+
+@pytest.mark.parametrize('hashing', [False, True])
+def test_rolling_updates_do_not_grow_the_vocabulary(hashing):
+    engine = TermImportance(hashing=hashing)
+    current = dict(DOCS)
+    for i in range(50):
+        # Each request sees a new window of commits with fresh one-off terms
+        current['parser'] = DOCS['parser'] + [f"bump version{i}", f"release tag{i}"]
+        for repo, messages in current.items():
+            engine.update(repo, messages)
+
+    expected = sklearn_scores(current)
+    assert set(engine.terms.values()) == {term for scores in expected.values() for term in scores}
+    if not hashing:
+        assert len(engine.doc_freq) == len(engine.vocabulary) == len(engine.terms)
+    assert_matches_sklearn(engine, current)
@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta
+import pytest
+from flask import Flask
+
+import warmer
+from cache import TieredCache
+from model import db, User, AnalysisSnapshot
+from warmer import CacheWarmer, load_snapshot, save_snapshot
+
+START = datetime(2024, 3, 4, 0, 0)
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock(START)
+    monkeypatch.setattr(warmer, 'utcnow', clock)
+    return clock
+
+
+@pytest.fixture
+def app(monkeypatch, clock):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    # Snapshots are read from the database so the test controls their age
+    monkeypatch.setattr(warmer, 'get_cache', lambda: TieredCache([]))
+    with app.app_context():
+        db.create_all()
+        yield app
+
+
+def add_user(username, last_login):
+    db.session.add(User(username=username, password_hash='x', last_login=last_login))
+    db.session.commit()
+
+
+def test_in_window_wraps_past_midnight():
+    cache_warmer = CacheWarmer(None, window='22:00-02:00')
+    at = lambda hour, minute: datetime(2024, 3, 4, hour, minute)
+    assert cache_warmer.in_window(at(23, 30))
+    assert cache_warmer.in_window(at(0, 0))
+    assert cache_warmer.in_window(at(1, 59))
+    assert not cache_warmer.in_window(at(2, 0))
+    assert not cache_warmer.in_window(at(21, 59))
+    assert CacheWarmer(None, window='').in_window(at(12, 0))
+
+
+def test_due_users_by_recent_login_without_fresh_snapshots(app, clock):
+    add_user('stale', START - timedelta(hours=1))
+    add_user('recent', START - timedelta(minutes=5))
+    add_user('fresh', START - timedelta(minutes=1))
+    add_user('inactive', START - timedelta(days=30))
+    add_user('never', None)
+    cache_warmer = CacheWarmer(app, window='')
+
+    clock.now = START - cache_warmer.refresh_after - timedelta(minutes=1)
+    save_snapshot('stale', cache_warmer.max_repos, '{}')
+    clock.now = START - timedelta(minutes=1)
+    save_snapshot('fresh', cache_warmer.max_repos, '{}')
+    # Snapshots for another max_repos do not count
+    save_snapshot('recent', cache_warmer.max_repos + 1, '{}')
+
+    clock.now = START
+    assert cache_warmer.due_users() == ['recent', 'stale']
+
+
+@pytest.mark.parametrize('computed_at', [timedelta(hours=5, minutes=55), timedelta(hours=6, minutes=5),
+                                         timedelta(hours=15), timedelta(hours=23)])
+def test_snapshots_stay_fresh_between_windows(app, clock, computed_at):
+    add_user('me', START)
+    cache_warmer = CacheWarmer(app, window='01:00-06:00')
+    clock.now = START + computed_at
+    save_snapshot('me', cache_warmer.max_repos, '{}')
+
+    # Passes run every interval inside the window; requests can arrive at any time
+    end = clock.now + timedelta(days=3)
+    while clock.now < end:
+        clock.now += timedelta(seconds=cache_warmer.interval)
+        if cache_warmer.in_window(clock.now) and 'me' in cache_warmer.due_users():
+            save_snapshot('me', cache_warmer.max_repos, '{}')
+        assert load_snapshot('me', cache_warmer.max_repos) is not None, clock.now
+
+    snapshot = AnalysisSnapshot.query.filter_by(username='me').one()
+    assert cache_warmer.in_window(snapshot.computed_at)
+
+
+def test_rate_limit_budget_stops_queueing(app, monkeypatch, tmp_path):
+    for i, username in enumerate(['a', 'b', 'c']):
+        add_user(username, START - timedelta(minutes=i))
+    cache_warmer = CacheWarmer(app, window='', max_concurrency=1, rate_limit_reserve=1000)
+    cost = cache_warmer.estimated_cost()
+    remaining = iter([1000 + cost, 1000 + cost - 1])
+
+    class StubAnalyzer:
+        def __init__(self, username):
+            pass
+
+        def rate_limit_remaining(self):
+            return next(remaining)
+
+    warmed = []
+    monkeypatch.setattr(warmer, 'GitHubAnalyzer', StubAnalyzer)
+    monkeypatch.setattr(cache_warmer, 'warm_user', lambda username: warmed.append(username) or True)
+    monkeypatch.setattr(cache_warmer, 'lock_path', str(tmp_path / 'warmer.lock'))
+
+    assert cache_warmer.run_once() == 1
+    assert warmed == ['a']
@@ -0,0 +1,214 @@
+import os
+import time
+import logging
+import argparse
+import fcntl
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from sqlalchemy.exc import IntegrityError
+from analyzer import GitHubAnalyzer
+from cache import get_cache
+from model import db, User, AnalysisSnapshot, utcnow
+
+logger = logging.getLogger(__name__)
+
+# A day plus the longest off-peak window, so a snapshot warmed in one window is
+# still served until the next window has refreshed it
+SNAPSHOT_TTL = timedelta(minutes=int(os.getenv('SNAPSHOT_TTL_MINUTES', 30 * 60)))
+
+# Pages fetched at most by GitHubAnalyzer.get_user_repos and get_commits_for_repo
+REPO_LISTING_PAGES = 10
+COMMIT_PAGES_PER_REPO = 5
+
+
+def load_snapshot(username, max_repos, max_age=SNAPSHOT_TTL):
+    """Return a fresh precomputed full analysis payload, or None"""
+    cache_key = f"full:{username}:{max_repos}"
+    payload = get_cache().get(cache_key)
+    if payload is not None:
+        return payload
+
+    snapshot = AnalysisSnapshot.query.filter_by(username=username, max_repos=max_repos).first()
+    if snapshot is None:
+        return None
+    remaining = max_age - (utcnow() - snapshot.computed_at)
+    if remaining <= timedelta(0):
+        return None
+    get_cache().set(cache_key, snapshot.payload, ttl=remaining.total_seconds())
+    return snapshot.payload
+
+
+def save_snapshot(username, max_repos, payload):
+    """Store a full analysis payload for later requests"""
+    get_cache().set(f"full:{username}:{max_repos}", payload, ttl=SNAPSHOT_TTL.total_seconds())
+
+    snapshot = AnalysisSnapshot.query.filter_by(username=username, max_repos=max_repos).first()
+    if snapshot is None:
+        snapshot = AnalysisSnapshot(username=username, max_repos=max_repos)
+        db.session.add(snapshot)
+    snapshot.payload = payload
+    snapshot.computed_at = utcnow()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another worker stored the same snapshot first
+        db.session.rollback()
+
+
+def parse_window(value):
+    """Parse 'HH:MM-HH:MM' into (start, end) minutes of the day. Empty means always."""
+    if not value:
+        return None
+    start, end = value.split('-')
+    to_minutes = lambda t: int(t.split(':')[0]) * 60 + int(t.split(':')[1])
+    return to_minutes(start), to_minutes(end)
+
+
+class CacheWarmer:
+    def __init__(self, app, max_repos=15, max_concurrency=None, window=None, active_days=None,
+                 rate_limit_reserve=None, churn_budget=200, interval=300):
+        """Pre-compute full analyses for recently active users during off-peak hours"""
+        self.app = app
+        self.max_repos = max_repos
+        self.max_concurrency = max_concurrency or int(os.getenv('WARMER_CONCURRENCY', 2))
+        self.window = parse_window(window if window is not None else os.getenv('WARMER_WINDOW', '01:00-06:00'))
+        self.active_days = active_days or int(os.getenv('WARMER_ACTIVE_DAYS', 14))
+        self.rate_limit_reserve = rate_limit_reserve if rate_limit_reserve is not None else int(os.getenv('WARMER_RATE_LIMIT_RESERVE', 1000))
+        self.churn_budget = churn_budget
+        self.interval = interval
+        # A snapshot that becomes due just after the window closes waits for the next
+        # window, so it must become due early enough to still be fresh by then
+        idle = timedelta(days=1) - self.window_length() if self.window else timedelta(0)
+        self.refresh_after = max(min(SNAPSHOT_TTL / 2, SNAPSHOT_TTL - idle - timedelta(seconds=interval)), timedelta(0))
+        # Held during a pass so warmers in other processes on the node skip theirs
+        self.lock_path = os.getenv('WARMER_LOCK_PATH') or os.path.join(os.getcwd(), "warmer.lock")
+
+    def in_window(self, now=None):
+        """Whether the local time is inside the off-peak window"""
+        if self.window is None:
+            return True
+        now = now or datetime.now()
+        minute = now.hour * 60 + now.minute
+        start, end = self.window
+        if start <= end:
+            return start <= minute < end
+        return minute >= start or minute < end
+
+    def window_length(self):
+        """Length of the off-peak window, zero when warming runs all day"""
+        if self.window is None:
+            return timedelta(0)
+        start, end = self.window
+        return timedelta(minutes=(end - start) % (24 * 60))
+
+    def estimated_cost(self):
+        """Upper bound on API requests for one user's full analysis"""
+        return REPO_LISTING_PAGES + self.max_repos * COMMIT_PAGES_PER_REPO + self.churn_budget
+
+    def due_users(self):
+        """Active users without a recent snapshot, most recent login first"""
+        cutoff = utcnow() - timedelta(days=self.active_days)
+        users = User.query.filter(
+            User.last_login.isnot(None), User.last_login >= cutoff
+        ).order_by(User.last_login.desc()).all()
+
+        fresh = {
+            snapshot.username for snapshot in AnalysisSnapshot.query.filter(
+                AnalysisSnapshot.max_repos == self.max_repos,
+                AnalysisSnapshot.computed_at >= utcnow() - self.refresh_after
+            )
+        }
+        return [user.username for user in users if user.username not in fresh]
+
+    def warm_user(self, username):
+        """Run and store the full analysis for one user"""
+        with self.app.app_context():
+            analyzer = GitHubAnalyzer(username, churn_budget=self.churn_budget)
+            try:
+                result = analyzer.full_analysis(max_repos=self.max_repos)
+            except LookupError:
+                return False
+            save_snapshot(username, self.max_repos, self.app.json.dumps(result))
+            return True
+
+    def run_once(self, force=False):
+        """Warm due users in priority order within the rate limit budget. Returns the number warmed."""
+        if not force and not self.in_window():
+            return 0
+
+        with open(self.lock_path, 'w') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return 0
+            try:
+                return self._warm_due_users()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _warm_due_users(self):
+        with self.app.app_context():
+            usernames = self.due_users()
+        if not usernames:
+            return 0
+
+        cost = self.estimated_cost()
+        warmed = 0
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            for username in usernames:
+                if len(running) >= self.max_concurrency:
+                    warmed += self._collect(running, wait(running, return_when=FIRST_COMPLETED).done)
+
+                # Interactive requests share the budget, so ask GitHub again before every user.
+                # Users still in flight may spend up to their full cost.
+                remaining = GitHubAnalyzer(username).rate_limit_remaining()
+                if remaining is None or remaining - self.rate_limit_reserve < cost * (len(running) + 1):
+                    break
+                running[executor.submit(self.warm_user, username)] = username
+
+            warmed += self._collect(running, list(running))
+        return warmed
+
+    def _collect(self, running, done):
+        warmed = 0
+        for future in done:
+            username = running.pop(future)
+            try:
+                warmed += bool(future.result())
+            except Exception:
+                logger.exception("Failed to warm analysis for %s", username)
+        return warmed
+
+    def run_forever(self):
+        while True:
+            try:
+                warmed = self.run_once()
+                if warmed:
+                    logger.info("Warmed %d analyses", warmed)
+            except Exception:
+                logger.exception("Cache warmer run failed")
+            time.sleep(self.interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-compute dashboard analyses for active users")
+    parser.add_argument('--once', action='store_true', help="run a single pass and exit")
+    parser.add_argument('--force', action='store_true', help="ignore the off-peak window")
+    parser.add_argument('--max-repos', type=int, default=15)
+    parser.add_argument('--concurrency', type=int, default=None)
+    parser.add_argument('--interval', type=int, default=300, help="seconds between passes")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    from app import app
+
+    warmer = CacheWarmer(app, max_repos=args.max_repos, max_concurrency=args.concurrency, interval=args.interval)
+    if args.once:
+        print(f"Warmed {warmer.run_once(force=args.force)} analyses")
+    else:
+        warmer.run_forever()
+
+
+if __name__ == '__main__':
+    main()